@@ -1,5 +1,4 @@
 import sqlite3
-import traceback
 import logging
 from typing import Optional, Any, Tuple
 
@@ -13,6 +12,7 @@ class DBConnector:
 
     def __enter__(self):
         self.conn = sqlite3.connect(self.db_name)
+        self.conn.execute("PRAGMA busy_timeout=30000")
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -32,7 +32,19 @@ class DBConnector:
             self.conn.commit()
             return cursor
         except sqlite3.Error as e:
-            logger.error(f"sqlite Error {e}: {traceback.format_exc()}")
+            logger.exception("sqlite Error %s", e)
             return None
         except Exception as e:
-            logger.error(f"Exception {e}: {traceback.format_exc()}")
+            logger.exception("Exception %s", e)
+
+    def execute_script(self, script: str) -> bool:
+        if not self.conn:
+            logger.info('DBConnector: Connection not established')
+            return False
+        try:
+            self.conn.executescript(script)
+            return True
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            logger.exception("sqlite Error %s", e)
+            return False
@@ -1,4 +1,3 @@
-import time
 import re
 from database.db_connector import DBConnector
 
@@ -6,21 +5,24 @@ from database.db_connector import DBConnector
 class DBCreator:
     """
     Handles the creation of database tables for storing dataframe chunks.
+    All tables are created over a single connection in one transaction.
     """
-    VALID_COLUMN_NAME = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
+    VALID_COLUMN_NAME = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_ ]*$")
 
-    def __init__(self, db_name: str, table_name: str, columns: dict):
+    def __init__(self, db_name: str, tables: dict):
         """
-        Initialize the DBCreator with the database name, table name, and columns.
+        Initialize the DBCreator with the database name and the tables to create.
 
         Args:
             db_name (str): Name of the database.
-            table_name (str): Name of the table to be created.
-            columns (dict): Dictionary with column names as keys and data types as values.
+            tables (dict): Dictionary with table names as keys and, as values, dictionaries with
+                column names as keys and data types as values.
         """
         self.db_name = db_name + '.db'
-        self.table_name = self._validate_table_name(table_name)
-        self.columns = self._validate_columns(columns)
+        self.tables = {
+            self._validate_table_name(table_name): self._validate_columns(columns)
+            for table_name, columns in tables.items()
+        }
 
     def _validate_table_name(self, table_name: str) -> str:
         """
@@ -62,15 +64,31 @@ class DBCreator:
 
         return columns
 
-    def create_table(self) -> None:
+    @staticmethod
+    def _storage_type(col_type: str) -> str:
         """
-        Creates a table in the database for storing dataframe chunks.
+        Map a declared column type to the type it is stored as.
+
+        Args:
+            col_type (str): Declared column type.
+
+        Returns:
+            str: SQLite column type.
         """
-        columns_def = ", ".join([f"{col_name} {col_type}" for col_name, col_type in self.columns.items()])
+        return 'INTEGER' if col_type.upper() == 'TIMESTAMP' else col_type
 
-        create_table_query = f"CREATE TABLE IF NOT EXISTS {self.table_name} ({columns_def})"
+    def create_tables(self) -> None:
+        """
+        Creates all tables in the database for storing dataframe chunks.
+        TIMESTAMP columns are declared INTEGER, as times are stored as int64 nanoseconds since the epoch.
+        """
+        statements = ["BEGIN;"]
+        for table_name, columns in self.tables.items():
+            columns_def = ", ".join([f'"{col_name}" {self._storage_type(col_type)}'
+                                     for col_name, col_type in columns.items()])
+            statements.append(f'CREATE TABLE IF NOT EXISTS "{table_name}" ({columns_def});')
+        statements.append("COMMIT;")
 
         with DBConnector(self.db_name) as db:
-            db.execute_query(create_table_query)
-            print(f"Table '{self.table_name}' created successfully in {self.db_name}")
-            time.sleep(5)
+            if db.execute_script("\n".join(statements)):
+                print(f"Tables {', '.join(self.tables)} created successfully in {self.db_name}")
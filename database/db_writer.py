@@ -1,58 +1,259 @@
 import os
-import time
+import re
 import sqlite3
+import tempfile
+import numpy as np
 import pandas as pd
-from multiprocessing import Queue, Process
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
+from pandas.api.types import (is_bool_dtype, is_datetime64_any_dtype, is_extension_array_dtype, is_float_dtype,
+                              is_integer_dtype)
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional, Tuple
 from data_models.model import DataModel
 from database.db_creator import DBCreator
 from database.db_connector import DBConnector
 from data_models.model import load_data
 
+SQLITE_PRAGMAS = (
+    "PRAGMA busy_timeout=30000",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-262144",
+)
 
-def filter_dataframe(reference_df: pd.DataFrame, target_df: pd.DataFrame, time_window: int = 1) -> pd.DataFrame:
+# Lets SQLite spread the sort behind GROUP BY / ORDER BY over worker threads. Temp storage stays on disk:
+# the sorter runs single-threaded with in-memory temp storage, and the largest tables would not fit in RAM.
+SORT_PRAGMAS = (
+    f"PRAGMA threads={os.cpu_count() or 1}",
+    "PRAGMA cache_size=-262144",
+)
+
+# Files are parsed in parallel by a process pool, so each worker reads single-threaded to avoid oversubscription.
+CSV_READ_OPTIONS = pa_csv.ReadOptions(block_size=8 << 20, use_threads=False)
+CSV_TIMESTAMP_PARSERS = [pa_csv.ISO8601, '%Y.%m.%d %H:%M:%S']
+
+# Arrow types the declared column types are read as, so no column of a table with a schema is typed
+# from the first block alone. INTEGER columns are read as float64 so values such as `100.0` still convert,
+# and SQLite's INTEGER affinity stores them as integers.
+ARROW_TYPES = {
+    'REAL': pa.float64(),
+    'INTEGER': pa.float64(),
+    'TEXT': pa.string(),
+    'TIMESTAMP': pa.timestamp('ns'),
+}
+
+# Names the position of the column whose value failed to convert in Arrow's CSV conversion errors.
+CSV_COLUMN_ERROR = re.compile(r'In CSV column #(\d+)')
+
+# Time columns in the order they are looked up, with the layout of their values.
+TIME_COLUMN_FORMATS = {
+    DataModel.time_column: '%Y-%m-%d %H:%M:%S.%f',
+    'RELEASE_TIME': '%Y.%m.%d %H:%M:%S',
+}
+
+
+def parse_time_column(series: pd.Series, time_format: str) -> pd.Series:
     """
-    Filters rows in the target DataFrame that are within a specified time window of the reference DataFrame.
+    Parses a time column with its known layout, hashing each distinct string only once and coercing
+    malformed values to NaT.
     Args:
-        reference_df (pd.DataFrame): DataFrame containing reference time points.
-        target_df (pd.DataFrame): DataFrame to be filtered.
-        time_window (int): Time window (in minutes) around the reference time points.
+        series (pd.Series): Time column to parse.
+        time_format (str): Layout of the values.
+    Returns:
+        pd.Series: Parsed datetimes, NaT where a value does not parse.
+    """
+    return pd.to_datetime(series, format=time_format, cache=True, errors='coerce')
+
+
+def parse_time_array(values: pa.Array, time_column: str) -> pa.Array:
+    """
+    Parses a time column read as strings into timestamps in Arrow. Values are assumed well formed:
+    `Gmt time` is cast strictly, and only when a value does not parse is the column handed to
+    `parse_time_column`. `RELEASE_TIME` is parsed with its layout, malformed values becoming null.
+    Args:
+        values (pa.Array): Time column as strings.
+        time_column (str): Name of the time column.
+    Returns:
+        pa.Array: Parsed timestamps, null where a value does not parse.
+    """
+    time_format = TIME_COLUMN_FORMATS[time_column]
+    if time_column != DataModel.time_column:
+        return pc.strptime(values, format=time_format, unit='ns', error_is_null=True)
+    try:
+        return pc.cast(values, ARROW_TYPES['TIMESTAMP'])
+    except pa.ArrowInvalid:
+        return pa.array(parse_time_column(values.to_pandas(), time_format), type=ARROW_TYPES['TIMESTAMP'])
+
+
+def declared_column_types(columns: dict) -> dict:
+    """
+    Maps a table's declared column types to the Arrow types its CSV files are read with.
+    Args:
+        columns (dict): Column names mapped to their declared types.
+    Returns:
+        dict: Column names mapped to Arrow types.
+    """
+    return {column: ARROW_TYPES[col_type.upper()] for column, col_type in columns.items()}
+
+
+def widened_column_types(schema: pa.Schema) -> dict:
+    """
+    Widens the types Arrow inferred from the first block of a file without a schema into types later
+    rows cannot break: integer columns are read as float64 and all-null columns as strings.
+    Args:
+        schema (pa.Schema): Schema inferred from the first block.
+    Returns:
+        dict: Column names mapped to Arrow types.
+    """
+    column_types = {}
+    for field in schema:
+        if pa.types.is_integer(field.type):
+            column_types[field.name] = pa.float64()
+        elif pa.types.is_null(field.type):
+            column_types[field.name] = pa.string()
+        else:
+            column_types[field.name] = field.type
+    return column_types
+
+
+def failed_column(error: pa.ArrowInvalid, names: list) -> Optional[str]:
+    """
+    Finds the column named by a CSV conversion error.
+    Args:
+        error (pa.ArrowInvalid): Error raised while scanning a CSV file.
+        names (list): Column names of the file, in file order.
+    Returns:
+        Optional[str]: The column whose value did not convert, or None if the error names no column.
+    """
+    match = CSV_COLUMN_ERROR.search(str(error))
+    if match is None or int(match.group(1)) >= len(names):
+        return None
+    return names[int(match.group(1))]
+
+
+def csv_format(column_types: Optional[dict] = None) -> ds.CsvFileFormat:
+    """
+    Builds the CSV format for a table, reading its columns with the given types and the time columns
+    as strings.
+    Args:
+        column_types (dict, optional): Column names mapped to Arrow types.
+    Returns:
+        ds.CsvFileFormat: Format to scan the table's CSV files with.
+    """
+    column_types = dict(column_types or {})
+    # Time columns are parsed by `filter_batch`, where malformed values are dropped rather than raising.
+    column_types.update({column: pa.string() for column in TIME_COLUMN_FORMATS})
+    convert_options = pa_csv.ConvertOptions(column_types=column_types, timestamp_parsers=CSV_TIMESTAMP_PARSERS)
+    return ds.CsvFileFormat(read_options=CSV_READ_OPTIONS, convert_options=convert_options)
+
+
+def find_time_column(columns, time_formats: dict = TIME_COLUMN_FORMATS) -> Optional[str]:
+    """
+    Finds the first known time column present in the given columns.
+    Args:
+        columns: Column labels of a DataFrame.
+        time_formats (dict): Known time columns mapped to their layouts.
+    Returns:
+        Optional[str]: The time column, or None if there is none.
+    """
+    columns = frozenset(columns)
+    return next((column for column in time_formats if column in columns), None)
+
+
+def _sql_type(dtype) -> str:
+    """
+    Maps a pandas dtype to the SQLite column type used when a table is created on first insert.
+    Args:
+        dtype: Dtype of a chunk column.
     Returns:
-        pd.DataFrame: Filtered DataFrame.
+        str: SQLite column type.
     """
+    if is_datetime64_any_dtype(dtype) or is_integer_dtype(dtype) or is_bool_dtype(dtype):
+        return 'INTEGER'
+    if is_float_dtype(dtype):
+        return 'REAL'
+    return 'TEXT'
 
-    reference_df[DataModel.time_column] = pd.to_datetime(reference_df[DataModel.time_column])
 
-    if DataModel.time_column in target_df.columns:
-        candle_time = DataModel.time_column
-        minutes = 1
-        time_format = '%Y-%m-%d %H:%M:%S.%f'
+def _bind_values(values) -> list:
+    """
+    Converts a column to a list of Python values for executemany.
+    Args:
+        values: Column or index of a chunk.
+    Returns:
+        list: Python values, with missing values in nullable columns as None so they bind as NULL.
+    """
+    if is_extension_array_dtype(values.dtype):
+        return values.to_numpy(dtype=object, na_value=None).tolist()
+    return values.to_numpy().tolist()
+
+
+def _insert_statement(table_name: str, columns: list) -> str:
+    """
+    Builds the parameterized INSERT statement for a table.
+    Args:
+        table_name (str): Target table.
+        columns (list): Columns to insert, in parameter order.
+    Returns:
+        str: INSERT statement with one placeholder per column.
+    """
+    column_names = ", ".join(f'"{column}"' for column in columns)
+    placeholders = ", ".join(["?"] * len(columns))
+    return f'INSERT INTO "{table_name}" ({column_names}) VALUES ({placeholders})'
+
+
+def build_time_windows(reference_df: pd.DataFrame, time_window: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Precomputes the time windows around the reference time points as sorted int64 nanosecond arrays.
+    Args:
+        reference_df (pd.DataFrame): DataFrame containing reference time points.
+        time_window (int): Time window (in minutes) around the reference time points.
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Sorted window start and end times.
+    """
+    times = pd.to_datetime(reference_df[DataModel.time_column]).to_numpy().astype('datetime64[ns]')
+    times = times[~np.isnat(times)]
+    window = np.timedelta64(time_window, 'm')
+    start = np.sort((times - window).view('i8'))
+    end = np.sort((times + window).view('i8'))
+    return start, end
 
-    elif DataModel.time_column in target_df.columns:
-        return target_df
-    elif 'RELEASE_TIME' in target_df.columns:
-        return target_df
-    else:
-        raise ValueError(
-            "Neither 'DataModel.time_column' nor 'DataModel.time_column' and 'RELEASE_TIME' column found in the "
-            "DataFrame")
 
-    target_df[candle_time] = pd.to_datetime(target_df[candle_time], format=time_format, errors='coerce')
-    target_df = target_df.dropna(subset=[candle_time]).reset_index(drop=True)
+def filter_batch(windows: Tuple[np.ndarray, np.ndarray], batch: pa.RecordBatch) -> pa.RecordBatch:
+    """
+    Parses the time column of the record batch and keeps the rows that fall inside one of the reference
+    time windows. Time columns are read as strings and parsed with `parse_time_array`; rows whose time
+    does not parse are dropped here instead of failing the scan, so the writer receives only parsed times.
+    Args:
+        windows (Tuple[np.ndarray, np.ndarray]): Sorted window start and end times from `build_time_windows`.
+        batch (pa.RecordBatch): Record batch to be filtered.
+    Returns:
+        pa.RecordBatch: Filtered record batch, with its time column as timestamps.
+    """
+    candle_time = find_time_column(batch.schema.names)
+    if candle_time is None:
+        raise ValueError(f"None of the time columns {list(TIME_COLUMN_FORMATS)} found in the record batch")
 
-    reference_df['start_time'] = reference_df[DataModel.time_column] - pd.Timedelta(minutes=minutes)
-    reference_df['end_time'] = reference_df[DataModel.time_column] + pd.Timedelta(minutes=minutes)
+    position = batch.schema.get_field_index(candle_time)
+    times = parse_time_array(batch.column(position), candle_time)
+    batch = batch.set_column(position, candle_time, times)
+    if candle_time != DataModel.time_column:
+        return batch.filter(times.is_valid())
 
-    merged_df = pd.merge_asof(
-        target_df.sort_values(candle_time),
-        reference_df[['start_time', 'end_time']].sort_values('start_time'),
-        left_on=candle_time,
-        right_on='start_time'
-    )
+    start, end = windows
+    if not len(start):
+        return batch.slice(0, 0)
 
-    filtered_candles = merged_df[(merged_df[candle_time] >= merged_df['start_time']) &
-                                 (merged_df[candle_time] <= merged_df['end_time'])]
+    # NaT views as the smallest int64, which sorts before every window start and is masked out.
+    times = times.to_numpy(zero_copy_only=False).astype('datetime64[ns]').view('i8')
+    idx = np.searchsorted(start, times, side='right') - 1
+    mask = (idx >= 0) & (times <= end[idx])
 
-    return filtered_candles.drop(columns=['start_time', 'end_time']).reset_index(drop=True)
+    return batch.filter(pa.array(mask))
 
 
 class DataFrameChunkWriter:
@@ -60,87 +261,232 @@ class DataFrameChunkWriter:
     Handles processing large dataframes in chunks and storing them into a database.
     """
 
-    def __init__(self, name: str, reference_df: pd.DataFrame, queue: Queue):
+    def __init__(self, name: str, reference_df: pd.DataFrame, spool_dir: str, schemas: dict = None):
         """
         Initialize the DataFrameChunkWriter.
         Args:
             name (str): Name of the database.
             reference_df (pd.DataFrame): Reference DataFrame for filtering.
-            queue (Queue): Multiprocessing queue for communication.
+            spool_dir (str): Directory the filtered Arrow files are written to.
+            schemas (dict, optional): Table names mapped to their column definitions.
         """
         self.db_name = name
-        self.queue = queue
-        self.news = reference_df
+        self.spool_dir = spool_dir
+        self.windows = build_time_windows(reference_df)
+        self._schemas = schemas or {}
+        self._columns = {table: list(columns) for table, columns in self._schemas.items()}
+        self._insert_sql = {}
 
-    def process_file(self, file_table: tuple) -> None:
+    def process_file(self, file_table: tuple) -> Tuple[Optional[str], str]:
         """
-        Process CSV file in chunks, filter the data, and put the chunks into the queue.
+        Scan the CSV file as an Arrow dataset, filter each record batch around the reference times,
+        and write the filtered batches to an Arrow IPC file in the spool directory.
+        Only the columns of the table's schema are read, when one is known, with their declared types.
+        Files without a schema are read with the types inferred from their first block, widened by
+        `widened_column_types`. If a value does not convert to the type its column is read with, the file
+        is scanned again with only that column read as a string, leaving the other columns typed.
         Args:
             file_table (tuple): Tuple containing file path and table name.
+        Returns:
+            Tuple[Optional[str], str]: Path of the Arrow file, None if the CSV file was not found, and the table name.
         """
-        """ Process CSV file in chunks and filter around times. """
-        chunk_size = 100000
         file_path, table = file_table
         try:
-            for chunk in pd.read_csv(file_path, chunksize=chunk_size):
-                filtered_chunk = filter_dataframe(self.news, chunk)
-                self.queue.put((filtered_chunk, table))
+            column_types = self._column_types(file_path, table)
+            while True:
+                try:
+                    return self._spool_file(file_path, table, column_types), table
+                except pa.ArrowInvalid as error:
+                    names = ds.dataset(file_path, format=csv_format()).schema.names
+                    column = failed_column(error, names)
+                    if column is None or column_types.get(column) == pa.string():
+                        raise
+                    column_types[column] = pa.string()
         except FileNotFoundError:
             print(f'File for {table} Table was not found.')
+            return None, table
 
-    def write_to_db(self) -> None:
+    def _column_types(self, file_path: str, table: str) -> dict:
         """
-        Write chunks of data from the queue into the database.
-        Retries on failure and closes the connection when finished.
+        Choose the Arrow types a file is read with: the declared types of its table, or the types inferred
+        from its first block when the table has no schema.
+        Args:
+            file_path (str): Path of the CSV file.
+            table (str): Target table.
+        Returns:
+            dict: Column names mapped to Arrow types.
         """
-        cnx = sqlite3.connect(f"{self.db_name}.db")
-        while True:
-            chunk, table_name = self.queue.get()
-            if chunk is None:
-                break
-            retry_count = 5
-            while retry_count > 0:
-                try:
-                    self._prepare_chunk_for_db(chunk)
-                    chunk.to_sql(table_name, cnx, if_exists='append', index=True)
-                    break
-                except sqlite3.OperationalError:
-                    retry_count -= 1
-                    time.sleep(1)
-            del chunk
-        cnx.close()
-
-    @staticmethod
-    def _prepare_chunk_for_db(chunk: pd.DataFrame) -> None:
-        """
-        Prepare chunk for database insertion by formatting time columns.
+        if table in self._schemas:
+            return declared_column_types(self._schemas[table])
+        return widened_column_types(ds.dataset(file_path, format=csv_format()).schema)
+
+    def _spool_file(self, file_path: str, table: str, column_types: dict) -> str:
+        """
+        Scan the CSV file with the given column types and write its filtered batches to an Arrow IPC file.
+        The Arrow file is removed if the scan fails.
         Args:
-            chunk (pd.DataFrame): Data chunk to be prepared.
+            file_path (str): Path of the CSV file.
+            table (str): Target table.
+            column_types (dict): Column names mapped to Arrow types.
+        Returns:
+            str: Path of the Arrow file.
         """
-        """ Prepare chunk for database insertion by formatting time columns. """
-        if DataModel.time_column in chunk.columns:
-            DataFrameChunkWriter.format_time_column(chunk, DataModel.time_column, '%Y-%m-%d %H:%M:%S.%f')
-            chunk.set_index(DataModel.time_column, inplace=True)
-        elif DataModel.time_column in chunk.columns:
-            DataFrameChunkWriter.format_time_column(chunk, DataModel.time_column, '%d.%m.%Y %H:%M:%S.%f')
-            chunk.set_index(DataModel.time_column, inplace=True)
-        elif 'RELEASE_TIME' in chunk.columns:
-            DataFrameChunkWriter.format_time_column(chunk, 'RELEASE_TIME', '%Y.%m.%d %H:%M:%S')
+        dataset = ds.dataset(file_path, format=csv_format(column_types))
+        columns = self._projection(dataset.schema.names, table)
+        schema = dataset.schema if columns is None else pa.schema([dataset.schema.field(name) for name in columns])
+        time_column = find_time_column(schema.names)
+        if time_column is not None:
+            schema = schema.set(schema.get_field_index(time_column), pa.field(time_column, ARROW_TYPES['TIMESTAMP']))
+        fd, arrow_path = tempfile.mkstemp(suffix='.arrow', dir=self.spool_dir)
+        os.close(fd)
+        try:
+            with pa.OSFile(arrow_path, 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+                for batch in dataset.to_batches(columns=columns, use_threads=False):
+                    filtered_batch = filter_batch(self.windows, batch)
+                    if filtered_batch.num_rows:
+                        writer.write_batch(filtered_batch)
+        except Exception:
+            os.remove(arrow_path)
+            raise
+        return arrow_path
 
-    @staticmethod
-    def format_time_column(df: pd.DataFrame, column_name: str, time_format: str) -> pd.DataFrame:
+    def _projection(self, names: list, table: str) -> Optional[list]:
         """
-        Formats a time column in the DataFrame to datetime objects.
+        Select the columns of a file that reach the table, keeping the time column needed for filtering.
         Args:
-            df (pd.DataFrame): DataFrame containing the time column.
-            column_name (str): Name of the time column to format.
-            time_format (str): Time format to parse.
+            names (list): Column names of the file.
+            table (str): Target table.
         Returns:
-            pd.DataFrame: DataFrame with the formatted time column.
+            Optional[list]: Columns to read, or None to read all of them when the table has no schema.
+        """
+        if table not in self._columns:
+            return None
+        wanted = set(self._columns[table])
+        time_column = find_time_column(names)
+        return [name for name in names if name in wanted or name == time_column]
+
+    def write_to_db(self, arrow_files: Iterable[Tuple[Optional[str], str]]) -> None:
+        """
+        Write the Arrow files produced by `process_file` into the database, one transaction per file,
+        removing each file once its rows are committed.
+        Lock contention is left to SQLite's busy handler. The connection runs in autocommit mode so the
+        explicit BEGIN/COMMIT are the only transaction control. Closes the connection when finished.
+        Args:
+            arrow_files (Iterable[Tuple[Optional[str], str]]): Arrow file paths and their table names.
+        """
+        cnx = sqlite3.connect(f"{self.db_name}.db", isolation_level=None)
+        try:
+            for pragma in SQLITE_PRAGMAS:
+                cnx.execute(pragma)
+            for arrow_path, table_name in arrow_files:
+                if arrow_path is None:
+                    continue
+                self._write_file(cnx, arrow_path, table_name)
+                os.remove(arrow_path)
+        finally:
+            cnx.close()
+
+    def _write_file(self, cnx: sqlite3.Connection, arrow_path: str, table_name: str) -> None:
+        """
+        Insert every record batch of an Arrow file inside a single transaction.
+        Args:
+            cnx (sqlite3.Connection): Open database connection.
+            arrow_path (str): Path of the Arrow IPC file.
+            table_name (str): Target table.
+        """
+        with pa.memory_map(arrow_path) as source:
+            reader = pa.ipc.open_file(source)
+            cnx.execute("BEGIN")
+            try:
+                for i in range(reader.num_record_batches):
+                    chunk = reader.get_batch(i).to_pandas()
+                    self._prepare_chunk_for_db(chunk)
+                    self._insert_chunk(cnx, chunk, table_name)
+                cnx.execute("COMMIT")
+            except sqlite3.Error:
+                cnx.rollback()
+                raise
+
+    def _insert_chunk(self, cnx: sqlite3.Connection, chunk: pd.DataFrame, table_name: str) -> None:
+        """
+        Insert a prepared chunk with executemany.
+        Only the table columns present in the chunk are inserted, leaving the others NULL; the INSERT
+        statement is cached per table and column set.
+        Args:
+            cnx (sqlite3.Connection): Open database connection.
+            chunk (pd.DataFrame): Data chunk, indexed by its time column.
+            table_name (str): Target table.
         """
-        if column_name in df.columns:
-            df[column_name] = pd.to_datetime(df[column_name], format=time_format, errors='coerce')
-        return df
+        if table_name not in self._columns:
+            self._register_table(cnx, chunk, table_name)
+
+        index_name = chunk.index.name or 'index'
+        present = set(chunk.columns) | {index_name}
+        columns = tuple(column for column in self._columns[table_name] if column in present)
+        key = (table_name, columns)
+        if key not in self._insert_sql:
+            self._insert_sql[key] = _insert_statement(table_name, list(columns))
+
+        data = [_bind_values(chunk.index if column == index_name else chunk[column]) for column in columns]
+        cnx.executemany(self._insert_sql[key], zip(*data))
+
+    def _register_table(self, cnx: sqlite3.Connection, chunk: pd.DataFrame, table_name: str) -> None:
+        """
+        Create a table without a schema from the chunk's layout and record its columns.
+        Args:
+            cnx (sqlite3.Connection): Open database connection.
+            chunk (pd.DataFrame): Data chunk whose index and columns define the layout.
+            table_name (str): Target table.
+        """
+        columns = [chunk.index.name or 'index'] + list(chunk.columns)
+        types = [_sql_type(chunk.index.dtype)] + [_sql_type(dtype) for dtype in chunk.dtypes]
+        columns_def = ", ".join(f'"{column}" {col_type}' for column, col_type in zip(columns, types))
+        cnx.execute(f'CREATE TABLE IF NOT EXISTS "{table_name}" ({columns_def})')
+
+        self._columns[table_name] = columns
+
+    def _prepare_chunk_for_db(self, chunk: pd.DataFrame) -> None:
+        """
+        Prepare chunk for database insertion. Time columns were parsed by `filter_batch`, so datetime columns
+        are only stored as int64 nanoseconds since the epoch, with NaT stored as NULL. Timezone-aware columns
+        are converted to UTC first.
+        Args:
+            chunk (pd.DataFrame): Data chunk to be prepared.
+        """
+        for column in chunk.columns:
+            if is_datetime64_any_dtype(chunk[column].dtype):
+                times = chunk[column]
+                if times.dt.tz is not None:
+                    times = times.dt.tz_convert(None)
+                values = times.to_numpy().astype('datetime64[ns]')
+                chunk[column] = pd.arrays.IntegerArray(values.view('i8'), np.isnat(values))
+        if find_time_column(chunk.columns) == DataModel.time_column:
+            chunk.set_index(DataModel.time_column, inplace=True)
+
+
+# Writer of the pool worker this module runs in, set once by `_init_worker`.
+_worker_writer: Optional[DataFrameChunkWriter] = None
+
+
+def _init_worker(writer: DataFrameChunkWriter) -> None:
+    """
+    Pool initializer that keeps the writer in the worker, so it is sent once per worker instead of once per file.
+    Args:
+        writer (DataFrameChunkWriter): Writer holding the time windows and schemas.
+    """
+    global _worker_writer
+    _worker_writer = writer
+
+
+def _process_file(file_table: tuple) -> Tuple[Optional[str], str]:
+    """
+    Runs `DataFrameChunkWriter.process_file` with the worker's writer.
+    Args:
+        file_table (tuple): Tuple containing file path and table name.
+    Returns:
+        Tuple[Optional[str], str]: Path of the Arrow file, or None, and the table name.
+    """
+    return _worker_writer.process_file(file_table)
 
 
 class DataExtractor:
@@ -152,7 +498,8 @@ class DataExtractor:
                  name: str,
                  data_paths: dict,
                  directory: str,
-                 reference_path: str = None):
+                 reference_path: str = None,
+                 schemas: dict = None):
         """
         Initialize the DataExtractor.
         Args:
@@ -160,11 +507,13 @@ class DataExtractor:
             data_paths (dict): Dictionary of file paths mapped to table names.
             directory (str): Directory containing additional CSV files.
             reference_path (str, optional): Path to the reference data file for filtering.
+            schemas (dict, optional): Table names mapped to their column definitions, created up front.
+                Tables without a schema are created from the first chunk written to them.
         """
-        self.queue = Queue()
         self.data_paths = data_paths
         self.directory = directory
         self.name = name
+        self.schemas = schemas or {}
         self.reference = load_data(reference_path) if reference_path else None
         self.csv_files = self.get_csv_files()
 
@@ -176,62 +525,68 @@ class DataExtractor:
         """
         csv_files = self.data_paths.copy()
 
-        files = [
-            filename
-            for filename in os.listdir(self.directory)
-            if os.path.isfile(os.path.join(self.directory, filename))
-               and filename.endswith(".csv")
-        ]
+        with os.scandir(self.directory) as entries:
+            files = [entry.path for entry in entries if entry.is_file() and entry.name.endswith(".csv")]
 
-        dynamic_tables = {os.path.join(self.directory, key): 'data_table' for key in files}
+        dynamic_tables = {path: 'data_table' for path in files}
         csv_files.update(dynamic_tables)
         return csv_files
 
     def run(self):
         """
         Starts the data extraction and writing process.
-        Spawns multiple processes for concurrent processing and database writing.
+        A process pool parses and filters the CSV files into Arrow files, which this process writes
+        into the database one file at a time, since SQLite serializes writes anyway.
+        The reference times are reduced to int64 windows once, and the writer holding them is handed to
+        each worker by the pool initializer, so per file only the path and table name are sent.
+        If writing fails, files not yet picked up by a worker are cancelled before the error is raised.
         """
-        DBCreator(self.name).create_table()
-        writer_process = Process(target=DataFrameChunkWriter(self.name, self.reference, self.queue).write_to_db)
-        writer_process.start()
-
-        processes = []
-        for file_table in self.csv_files.items():
-            p = Process(target=DataFrameChunkWriter(self.name, self.reference, self.queue).process_file,
-                        args=(file_table,))
-            p.start()
-            processes.append(p)
-
-        for p in processes:
-            p.join()
-
-        self.queue.put((None, None))
-        writer_process.join()
+        if self.schemas:
+            DBCreator(self.name, self.schemas).create_tables()
+        with tempfile.TemporaryDirectory() as spool_dir:
+            writer = DataFrameChunkWriter(self.name, self.reference, spool_dir, self.schemas)
+            with ProcessPoolExecutor(initializer=_init_worker, initargs=(writer,)) as pool:
+                try:
+                    writer.write_to_db(pool.map(_process_file, self.csv_files.items()))
+                except Exception:
+                    pool.shutdown(cancel_futures=True)
+                    raise
 
 
 def sort_table_on_time(db_name: str, table_name: str, time_column_name: str):
     """
     Sorts the specified table to facilitate easier access to specific times by:
-        - Removing duplicate rows based on the specified time column.
-        - Creating a new table with distinct rows ordered by the time column.
+        - Creating a new table holding the first row of each time, ordered by the time column.
         - Replacing the old table with the new sorted version.
         - Creating a unique index on the time column to maintain order and uniqueness.
+    All steps run in a single transaction, so a failure leaves the original table untouched.
     Args:
         db_name (str): Name of the database.
         table_name (str): Name of the table to sort and clean.
         time_column_name (str): Name of the time column to base the sorting on.
+
+    Raises:
+        ValueError: If the table or column name is invalid.
+    """
+    for identifier in (table_name, time_column_name):
+        if not DBCreator.VALID_COLUMN_NAME.match(identifier):
+            raise ValueError(f"Invalid identifier: {identifier}")
+
+    table = f'"{table_name}"'
+    clean_table = f'"{table_name}_clean"'
+    column = f'"{time_column_name}"'
+    index = f'"idx_{table_name}_{time_column_name.replace(" ", "_")}"'
+    script = f"""
+        BEGIN;
+        CREATE TABLE {clean_table} AS SELECT * FROM {table}
+            WHERE rowid IN (SELECT MIN(rowid) FROM {table} GROUP BY {column}) ORDER BY {column};
+        DROP TABLE {table};
+        ALTER TABLE {clean_table} RENAME TO {table};
+        CREATE UNIQUE INDEX {index} ON {table}({column});
+        COMMIT;
     """
-    queries = [
-        ("DELETE FROM {} WHERE rowid NOT IN(SELECT MIN(rowid) FROM {} GROUP BY ?);", (table_name, table_name,
-                                                                                      time_column_name)),
-        ("CREATE TABLE {}_clean AS SELECT DISTINCT * FROM {} ORDER BY ?;", (table_name, table_name, time_column_name)),
-        ("DROP TABLE {};", (table_name,)),
-        ("ALTER TABLE {}_clean RENAME TO {};", (table_name, table_name)),
-        ("CREATE UNIQUE INDEX idx_{}_{} ON {}(?);", (table_name, time_column_name.replace(' ', '_'),
-                                                     table_name, time_column_name))
-    ]
     with DBConnector(db_name) as db:
-        for query, params in queries:
-            db.execute_query(query.format(*params))
-        print(f"Table {table_name} modified successfully in {db_name}")
+        for pragma in SORT_PRAGMAS:
+            db.execute_query(pragma)
+        if db.execute_script(script):
+            print(f"Table {table_name} modified successfully in {db_name}")
@@ -24,8 +24,9 @@ if not os.path.exists("Trade Specifications"):
 
 
 def remove_temporary_files(output_dir):
-    for file_name in os.listdir(output_dir):
-        os.remove(os.path.join(output_dir, file_name))
+    with os.scandir(output_dir) as entries:
+        for entry in entries:
+            os.remove(entry.path)
     os.rmdir(output_dir)
 
 
@@ -0,0 +1,263 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+import warnings
+from contextlib import closing
+from unittest import mock
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from data_models.model import DataModel
+from database import db_writer
+
+REFERENCE = pd.DataFrame({DataModel.time_column: ['2020-01-01 00:30:00']})
+
+
+def _load(arrow_path: str) -> pa.Table:
+    """
+    Reads back an Arrow IPC file written by `process_file`.
+    """
+    with pa.memory_map(arrow_path) as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def _prices(**columns) -> pd.DataFrame:
+    """
+    Builds an hour of per-second prices with the given columns.
+    """
+    times = pd.date_range('2020-01-01', periods=3600, freq='s')
+    return pd.DataFrame({DataModel.time_column: times.strftime('%Y-%m-%d %H:%M:%S.000'), **columns})
+
+
+class FilterBatchTest(unittest.TestCase):
+    """
+    Tests for filtering record batches against the reference time windows.
+    """
+
+    def _filter(self, reference_times: list, times: list) -> list:
+        windows = db_writer.build_time_windows(pd.DataFrame({DataModel.time_column: reference_times}))
+        batch = pa.record_batch({DataModel.time_column: pa.array(times, type=pa.string())})
+        result = db_writer.filter_batch(windows, batch)
+        return [str(value) for value in result.column(0).to_pandas()]
+
+    def test_window_edges_are_inclusive(self):
+        kept = self._filter(['2020-01-01 00:30:00'], [
+            '2020-01-01 00:28:59.999',
+            '2020-01-01 00:29:00.000',
+            '2020-01-01 00:31:00.000',
+            '2020-01-01 00:31:00.001',
+        ])
+        self.assertEqual(kept, ['2020-01-01 00:29:00', '2020-01-01 00:31:00'])
+
+    def test_overlapping_and_separate_windows(self):
+        kept = self._filter(['2020-01-01 01:00:00', '2020-01-01 00:30:30', '2020-01-01 00:30:00'], [
+            '2020-01-01 00:29:30.000',
+            '2020-01-01 00:31:30.000',
+            '2020-01-01 00:31:30.001',
+            '2020-01-01 00:45:00.000',
+            '2020-01-01 00:59:00.000',
+        ])
+        self.assertEqual(kept, ['2020-01-01 00:29:30', '2020-01-01 00:31:30', '2020-01-01 00:59:00'])
+
+    def test_malformed_times_are_dropped(self):
+        kept = self._filter(['2020-01-01 00:30:00'], ['2020-01-01 00:30:00.000', 'n/a', None])
+        self.assertEqual(kept, ['2020-01-01 00:30:00'])
+
+    def test_release_times_are_parsed_without_windows(self):
+        windows = db_writer.build_time_windows(REFERENCE)
+        batch = pa.record_batch({'RELEASE_TIME': pa.array(['2021.03.04 05:06:07', '2021-03-04 05:06:07', None])})
+        result = db_writer.filter_batch(windows, batch)
+        self.assertEqual(result.column(0).to_pylist(), [pd.Timestamp('2021-03-04 05:06:07')])
+
+    def test_no_reference_times_keeps_nothing(self):
+        self.assertEqual(self._filter([], ['2020-01-01 00:30:00.000']), [])
+
+
+class ProcessFileTest(unittest.TestCase):
+    """
+    Tests for scanning CSV files into filtered Arrow files.
+    """
+
+    BLOCK_SIZE = 1 << 10
+
+    def setUp(self):
+        self.spool = tempfile.TemporaryDirectory()
+        self.addCleanup(self.spool.cleanup)
+        self.writer = db_writer.DataFrameChunkWriter('unused', REFERENCE, self.spool.name)
+
+    def _write_prices_csv(self, **columns) -> str:
+        """
+        Writes an hour of per-second prices with the given columns, spanning several CSV blocks.
+        """
+        csv_path = os.path.join(self.spool.name, 'prices.csv')
+        _prices(**columns).to_csv(csv_path, index=False)
+        self.assertGreater(os.path.getsize(csv_path) // 2, self.BLOCK_SIZE)
+        return csv_path
+
+    def _scan(self, csv_path: str, table: str = 'data_table') -> pa.Table:
+        """
+        Runs `process_file` with small blocks and reads back the Arrow file it wrote.
+        """
+        read_options = pa_csv.ReadOptions(block_size=self.BLOCK_SIZE, use_threads=False)
+        with mock.patch.object(db_writer, 'CSV_READ_OPTIONS', read_options):
+            arrow_path, scanned_table = self.writer.process_file((csv_path, table))
+        self.assertEqual(scanned_table, table)
+        self.assertCountEqual(os.listdir(self.spool.name), [os.path.basename(csv_path), os.path.basename(arrow_path)])
+        return _load(arrow_path)
+
+    def test_schemaless_integer_column_takes_fraction_after_first_block(self):
+        volume = [str(i) for i in range(3600)]
+        volume[1800] = '10.5'
+
+        result = self._scan(self._write_prices_csv(Volume=volume))
+
+        self.assertEqual(result.schema.field('Volume').type, pa.float64())
+        self.assertEqual(result.num_rows, 121)
+        self.assertIn(10.5, result.column('Volume').to_pylist())
+
+    def test_schemaless_float_column_takes_text_after_first_block(self):
+        spread = [f'{i}.5' for i in range(3600)]
+        spread[1800] = '-'
+
+        result = self._scan(self._write_prices_csv(Open=[f'{i}.25' for i in range(3600)], Spread=spread))
+
+        self.assertEqual(result.schema.field('Open').type, pa.float64())
+        self.assertEqual(result.schema.field('Spread').type, pa.string())
+        self.assertEqual(result.num_rows, 121)
+        self.assertIn('-', result.column('Spread').to_pylist())
+
+
+class WriteToDbTest(unittest.TestCase):
+    """
+    Tests for writing filtered Arrow files into the database.
+    """
+
+    def setUp(self):
+        self.spool = tempfile.TemporaryDirectory()
+        self.addCleanup(self.spool.cleanup)
+        self.db_name = os.path.join(self.spool.name, 'test')
+
+    def _write(self, frame: pd.DataFrame, schemas: dict = None, create_sql: str = None) -> None:
+        """
+        Creates the table, if given, and writes the frame through `process_file` and `write_to_db`.
+        """
+        if create_sql:
+            with closing(sqlite3.connect(f'{self.db_name}.db')) as cnx:
+                cnx.execute(create_sql)
+        csv_path = os.path.join(self.spool.name, 'prices.csv')
+        frame.to_csv(csv_path, index=False)
+        writer = db_writer.DataFrameChunkWriter(self.db_name, REFERENCE, self.spool.name, schemas)
+        writer.write_to_db([writer.process_file((csv_path, 'data_table'))])
+
+    def _rows(self, query: str) -> list:
+        with closing(sqlite3.connect(f'{self.db_name}.db')) as cnx:
+            return cnx.execute(query).fetchall()
+
+    def test_declared_column_missing_from_file_is_left_null(self):
+        self._write(
+            pd.DataFrame({
+                DataModel.time_column: ['2020-01-01 00:30:00.000', '2020-01-01 00:30:01.000'],
+                'Open': [1.5, 2.5],
+            }),
+            {'data_table': {DataModel.time_column: 'TIMESTAMP', 'Open': 'REAL', 'Close': 'REAL'}},
+            'CREATE TABLE data_table ("Gmt time" INTEGER, "Open" REAL, "Close" REAL)',
+        )
+
+        rows = self._rows('SELECT "Open", "Close" FROM data_table ORDER BY "Gmt time"')
+        self.assertEqual(rows, [(1.5, None), (2.5, None)])
+
+    def test_declared_integer_column_takes_fractional_notation(self):
+        self._write(
+            pd.DataFrame({
+                DataModel.time_column: ['2020-01-01 00:30:00.000', '2020-01-01 00:30:01.000'],
+                'Volume': ['100.0', '7'],
+            }),
+            {'data_table': {DataModel.time_column: 'TIMESTAMP', 'Volume': 'INTEGER'}},
+            'CREATE TABLE data_table ("Gmt time" INTEGER, "Volume" INTEGER)',
+        )
+
+        rows = self._rows('SELECT "Volume", typeof("Volume") FROM data_table ORDER BY "Gmt time"')
+        self.assertEqual(rows, [(100, 'integer'), (7, 'integer')])
+
+    def test_text_fallback_keeps_other_columns_real(self):
+        spread = [f'{i}.5' for i in range(3600)]
+        spread[1800] = '-'
+
+        read_options = pa_csv.ReadOptions(block_size=1 << 10, use_threads=False)
+        with mock.patch.object(db_writer, 'CSV_READ_OPTIONS', read_options):
+            self._write(_prices(Open=[f'{i}.25' for i in range(3600)], Spread=spread))
+
+        types = self._rows('SELECT name, type FROM pragma_table_info(\'data_table\')')
+        self.assertEqual(types, [(DataModel.time_column, 'INTEGER'), ('Open', 'REAL'), ('Spread', 'TEXT')])
+        self.assertEqual(self._rows('SELECT DISTINCT typeof("Open") FROM data_table'), [('real',)])
+
+    def test_datetime_columns_store_nanoseconds_and_nat_as_null(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', UserWarning)
+            self._write(pd.DataFrame({
+                DataModel.time_column: ['2020-01-01 00:30:00.000', '2020-01-01 00:30:01.000'],
+                'Opened': ['2020-01-01 00:00:01', None],
+                'Settled': [None, '2020-01-01T02:00:01+02:00'],
+            }))
+
+        rows = self._rows('SELECT "Gmt time", "Opened", "Settled" FROM data_table ORDER BY "Gmt time"')
+        second = pd.Timestamp('2020-01-01 00:00:01').value
+        self.assertEqual(rows, [(pd.Timestamp('2020-01-01 00:30:00').value, second, None),
+                                (pd.Timestamp('2020-01-01 00:30:01').value, None, second)])
+
+
+class SortTableOnTimeTest(unittest.TestCase):
+    """
+    Tests for deduplicating and sorting a table on its time column.
+    """
+
+    def setUp(self):
+        self.spool = tempfile.TemporaryDirectory()
+        self.addCleanup(self.spool.cleanup)
+        self.db_path = os.path.join(self.spool.name, 'test.db')
+        with closing(sqlite3.connect(self.db_path)) as cnx, cnx:
+            cnx.execute('CREATE TABLE prices ("Gmt time" INTEGER, "Open" REAL)')
+            cnx.executemany('INSERT INTO prices VALUES (?, ?)', [(2, 1.0), (1, 2.0), (2, 3.0), (1, 4.0), (3, 5.0)])
+
+    def _query(self, query: str) -> list:
+        with closing(sqlite3.connect(self.db_path)) as cnx:
+            return cnx.execute(query).fetchall()
+
+    def test_keeps_first_row_of_each_time_in_time_order(self):
+        db_writer.sort_table_on_time(self.db_path, 'prices', 'Gmt time')
+
+        self.assertEqual(self._query('SELECT "Gmt time", "Open" FROM prices'), [(1, 2.0), (2, 1.0), (3, 5.0)])
+        self.assertEqual(self._query("SELECT name FROM sqlite_master WHERE type = 'table'"), [('prices',)])
+
+    def test_creates_unique_index_on_time_column(self):
+        db_writer.sort_table_on_time(self.db_path, 'prices', 'Gmt time')
+
+        self.assertEqual(self._query("SELECT name, \"unique\" FROM pragma_index_list('prices')"),
+                         [('idx_prices_Gmt_time', 1)])
+        self.assertEqual(self._query("SELECT name FROM pragma_index_info('idx_prices_Gmt_time')"), [('Gmt time',)])
+
+    def test_invalid_identifier_raises(self):
+        with self.assertRaises(ValueError):
+            db_writer.sort_table_on_time(self.db_path, 'prices; DROP TABLE prices', 'Gmt time')
+        with self.assertRaises(ValueError):
+            db_writer.sort_table_on_time(self.db_path, 'prices', 'Gmt time"')
+
+    def test_failing_script_leaves_table_untouched(self):
+        with closing(sqlite3.connect(self.db_path)) as cnx, cnx:
+            # The index name is taken, so the script fails on its last statement, after DROP and RENAME.
+            cnx.execute('CREATE TABLE other (id INTEGER)')
+            cnx.execute('CREATE INDEX "idx_prices_Gmt_time" ON other(id)')
+        before = self._query('SELECT "Gmt time", "Open" FROM prices')
+
+        with self.assertLogs('database.db_connector', 'ERROR'):
+            db_writer.sort_table_on_time(self.db_path, 'prices', 'Gmt time')
+
+        self.assertEqual(self._query('SELECT "Gmt time", "Open" FROM prices'), before)
+        self.assertEqual(self._query("SELECT name FROM pragma_index_list('prices')"), [])
+        self.assertEqual(self._query("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name"),
+                         [('other',), ('prices',)])
+
+
+if __name__ == '__main__':
+    unittest.main()